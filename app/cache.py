@@ -0,0 +1,150 @@
+import os
+from typing import NamedTuple
+
+from cachetools import TTLCache
+from fastapi_cache import FastAPICache
+from fastapi_cache.backends.inmemory import InMemoryBackend
+from fastapi_cache.backends.redis import RedisBackend
+from redis import asyncio as aioredis
+
+# Unset means a per-process in-memory cache, so local runs still need no Redis
+REDIS_URL = os.getenv("REDIS_URL")
+
+CACHE_PREFIX = "tm"
+TASKS_NAMESPACE = "tasks"
+
+
+class CachedUser(NamedTuple):
+    id: int
+    username: str
+
+
+# user_id -> CachedUser for token checks; a deleted user stays valid for up to ttl
+# unless forget_user() is called. Only touched from the event loop, so no lock.
+user_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+# Successful logins, keyed by (user_id, stored hash, HMAC of the password) so a
+# repeat login skips bcrypt. Including the stored hash means a password change
+# misses the cache; the HMAC key is per-process, so entries are useless if leaked.
+login_cache = TTLCache(maxsize=10_000, ttl=60)
+
+
+def init_cache():
+    if REDIS_URL:
+        backend = TaggedRedisBackend(aioredis.from_url(REDIS_URL))
+    else:
+        backend = BoundedInMemoryBackend()
+    FastAPICache.init(backend, prefix=CACHE_PREFIX)
+
+
+def _in_namespace(key: str, namespace: str) -> bool:
+    # Match whole segments, so "tm:tasks:1" doesn't also cover "tm:tasks:10"
+    return key == namespace or key.startswith(namespace + ":")
+
+
+class BoundedInMemoryBackend(InMemoryBackend):
+    """InMemoryBackend with a size-capped store.
+
+    The stock store is a plain dict that only drops an expired entry when that
+    key is read again, so it grows with every distinct key. A TTLCache evicts the
+    oldest entries past maxsize and anything older than ttl; the per-entry expire
+    is still checked on read. ttl should be at least the longest @cache expire.
+    """
+
+    def __init__(self, maxsize: int = 10_000, ttl: int = 300):
+        self._store = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    async def clear(self, namespace=None, key=None):
+        if namespace:
+            async with self._lock:
+                keys = [k for k in self._store if _in_namespace(k, namespace)]
+                for k in keys:
+                    self._store.pop(k, None)
+            return len(keys)
+        return await super().clear(namespace, key)
+
+
+# Keys are laid out as "<prefix>:tasks:<user_id>:..." so that a user's entries
+# can be dropped together by clearing the "tasks:<user_id>" namespace
+def _tag_for(key: str) -> str:
+    # "tm:tasks:1:list:page=2" -> "tag:tm:tasks:1"
+    return "tag:" + ":".join(key.split(":", 3)[:3])
+
+
+# Unlinks every key recorded under a tag, then the tag itself, atomically and in
+# one round trip. UNLINK is batched because Lua's unpack() has a stack limit.
+_UNLINK_TAGGED = """
+local keys = redis.call('SMEMBERS', KEYS[1])
+for i = 1, #keys, 5000 do
+    redis.call('UNLINK', unpack(keys, i, math.min(i + 4999, #keys)))
+end
+redis.call('UNLINK', KEYS[1])
+return #keys
+"""
+
+
+# Drops members whose key has already expired; returns how many are left
+_PRUNE_TAGGED = """
+for _, key in ipairs(redis.call('SMEMBERS', KEYS[1])) do
+    if redis.call('EXISTS', key) == 0 then
+        redis.call('SREM', KEYS[1], key)
+    end
+end
+return redis.call('SCARD', KEYS[1])
+"""
+
+
+class TaggedRedisBackend(RedisBackend):
+    """RedisBackend that records each key in a per-user tag set.
+
+    Clearing a "<prefix>:tasks:<user_id>" namespace then unlinks that set's
+    members directly, instead of the stock clear() running KEYS over the
+    whole keyspace. Members are otherwise only removed on clear, so a tag that
+    grows past max_tag_size is pruned of keys that have expired.
+    """
+
+    max_tag_size = 1000
+
+    async def set(self, key, value, expire=None):
+        tag = _tag_for(key)
+        async with self.redis.pipeline(transaction=True) as pipe:
+            pipe.set(key, value, ex=expire)
+            pipe.sadd(tag, key)
+            if expire:
+                # Every set refreshes this, so the tag outlives all its members
+                pipe.expire(tag, expire)
+            pipe.scard(tag)
+            size = (await pipe.execute())[-1]
+        if size > self.max_tag_size:
+            await self.redis.eval(_PRUNE_TAGGED, 1, tag)
+
+    async def clear(self, namespace=None, key=None):
+        if namespace and namespace.count(":") == 2:
+            return await self.redis.eval(_UNLINK_TAGGED, 1, f"tag:{namespace}")
+        return await super().clear(namespace, key)
+
+
+def task_list_key(func, namespace="", request=None, response=None, args=None, kwargs=None):
+    # One entry per (user, page/filter). Built from the validated params rather
+    # than the raw query string, so unknown or reordered params share an entry.
+    user_id = kwargs["current_user"].id
+    fields = ",".join(sorted(set(kwargs["fields"]))) if kwargs["fields"] else ""
+    params = (kwargs["page"], kwargs["limit"], kwargs["cursor"], fields,
+              kwargs["due_before"], kwargs["due_after"])
+    return f"{FastAPICache.get_prefix()}:{namespace}:{user_id}:list:" + ":".join(
+        "" if value is None else str(value) for value in params
+    )
+
+
+def task_detail_key(func, namespace="", request=None, response=None, args=None, kwargs=None):
+    user_id = kwargs["current_user"].id
+    return f"{FastAPICache.get_prefix()}:{namespace}:{user_id}:{kwargs['task_id']}"
+
+
+async def invalidate_user_tasks(user_id: int):
+    await FastAPICache.clear(namespace=f"{TASKS_NAMESPACE}:{user_id}")
+
+
+def forget_user(user_id: int):
+    user_cache.pop(user_id, None)
@@ -1,25 +1,102 @@
-from sqlalchemy import create_engine
+import logging
+
+from sqlalchemy import String, and_, event, func, not_, text, type_coerce, update
+from sqlalchemy.ext.asyncio import async_sessionmaker, create_async_engine
 from sqlalchemy.ext.declarative import declarative_base
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy.pool import AsyncAdaptedQueuePool
+
+logger = logging.getLogger(__name__)
 
-DATABASE_URL = "sqlite:///./taskmanager.db"
+DATABASE_URL = "sqlite+aiosqlite:///./taskmanager.db"
 
-engine = create_engine(
-    DATABASE_URL, connect_args={"check_same_thread": False}
+# aiosqlite defaults to NullPool, i.e. a new connection (and a cold page cache)
+# per session; keep a pool of warm connections instead
+engine = create_async_engine(
+    DATABASE_URL,
+    poolclass=AsyncAdaptedQueuePool,
+    pool_size=10,
+    max_overflow=20,
+    pool_pre_ping=True,
+    insertmanyvalues_page_size=1000,
 )
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+
+
+@event.listens_for(engine.sync_engine, "connect")
+def set_sqlite_pragmas(dbapi_connection, connection_record):
+    # WAL lets readers run alongside a writer; NORMAL sync is safe under WAL
+    # and avoids an fsync on every commit
+    cursor = dbapi_connection.cursor()
+    # Only takes effect on a new database file (before any table exists)
+    cursor.execute("PRAGMA auto_vacuum=INCREMENTAL")
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute("PRAGMA cache_size=-64000")  # 64 MB page cache
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.execute("PRAGMA mmap_size=268435456")  # 256 MB
+    cursor.execute("PRAGMA foreign_keys=ON")
+    cursor.execute("PRAGMA secure_delete=OFF")  # don't zero freed pages on delete
+    cursor.close()
+
+
+# expire_on_commit=False: an expired attribute would need a lazy load, which
+# AsyncSession can't do implicitly
+SessionLocal = async_sessionmaker(engine, autoflush=False, expire_on_commit=False)
 
 Base = declarative_base()
 
 
-def get_db():
-    db = SessionLocal()
-    try:
+async def get_db():
+    async with SessionLocal() as db:
         yield db
-    finally:
-        db.close()
 
 
-def create_tables():
+async def create_tables():
     from app.models import Task, User  # noqa: F401
-    Base.metadata.create_all(bind=engine)
+    async with engine.begin() as conn:
+        await conn.run_sync(Base.metadata.create_all)
+        await conn.run_sync(_upgrade_schema)
+        # Refresh planner statistics for the task indexes
+        await conn.execute(text("ANALYZE"))
+
+    # Reclaim pages freed since the last start. sqlite3's execute() steps
+    # PRAGMA incremental_vacuum once, which frees a single page; executescript()
+    # runs it to completion. Done outside the transaction above, since
+    # executescript() commits first.
+    async with engine.connect() as conn:
+        raw = await conn.get_raw_connection()
+        await raw.driver_connection.executescript("PRAGMA incremental_vacuum")
+
+
+_ISO_DATE_GLOB = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9]*"
+
+
+def _upgrade_schema(conn):
+    # create_all() skips tables that already exist, so bring databases made by
+    # older versions up to date here. Every step is idempotent.
+    from app.models import Task
+    for index in Task.__table__.indexes:
+        index.create(conn, checkfirst=True)
+
+    # due_date used to be free text. Keep values that start with a real ISO date,
+    # normalised to YYYY-MM-DD, and clear everything else, which the Date column
+    # could not load. The shape check matters: date() reads a bare number such as
+    # '2024' as a Julian day and returns a negative year. date() also accepts any
+    # day up to 31, but with a modifier it rolls '2024-02-30' over to '2024-03-01',
+    # so requiring the result to match the input's date part rejects those.
+    raw = type_coerce(Task.due_date, String)
+    normalised = func.date(raw, "+0 days", type_=String)
+    iso_shaped = and_(
+        raw.op("GLOB")(_ISO_DATE_GLOB),
+        normalised.is_not(None),  # keeps the predicate from going NULL under not_()
+        normalised == func.substr(raw, 1, 10),
+    )
+    conn.execute(
+        update(Task)
+        .where(raw.is_not(None), iso_shaped, raw != normalised)
+        .values(due_date=normalised)
+    )
+    cleared = conn.execute(
+        update(Task).where(raw.is_not(None), not_(iso_shaped)).values(due_date=None)
+    ).rowcount
+    if cleared:
+        logger.warning("Cleared %d task due_date value(s) that are not ISO 8601 dates", cleared)
@@ -1,13 +1,18 @@
+import json
 from contextlib import asynccontextmanager
-from fastapi import FastAPI
+from fastapi import FastAPI, Response
+from fastapi.responses import ORJSONResponse
+from starlette.datastructures import MutableHeaders
 
+from app.cache import init_cache
 from app.database import create_tables
 from app.routers import tasks, users
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
-    create_tables()
+    await create_tables()
+    init_cache()
     yield
 
 
@@ -16,17 +21,59 @@ app = FastAPI(
     description="A personal task manager REST API. Manage tasks with priorities, statuses, and due dates.",
     version="0.1.0",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 app.include_router(tasks.router)
 app.include_router(users.router)
 
 
+class PrivateResponses:
+    """Marks responses under a path prefix as private to the requesting token.
+
+    Task responses are per user and keyed by the X-Token header. Without this,
+    fastapi-cache2's max-age would let browsers and proxies reuse them: stale
+    after a write, or across users in a shared cache. Clients still revalidate
+    cheaply through the ETag. Plain ASGI, so other paths pass straight through.
+    """
+
+    def __init__(self, app, prefix: str):
+        self.app = app
+        self.prefix = prefix
+
+    async def __call__(self, scope, receive, send):
+        path = scope.get("path", "")
+        in_prefix = path == self.prefix or path.startswith(self.prefix + "/")
+        if scope["type"] != "http" or not in_prefix:
+            await self.app(scope, receive, send)
+            return
+
+        async def send_private(message):
+            if message["type"] == "http.response.start":
+                headers = MutableHeaders(scope=message)
+                headers["Cache-Control"] = "private, no-cache"
+                headers["Vary"] = "X-Token"
+            await send(message)
+
+        await self.app(scope, receive, send_private)
+
+
+app.add_middleware(PrivateResponses, prefix=tasks.router.prefix)
+
+
+# Probe responses never change, so serialize them once instead of per request
+_HEALTH = Response(content=b'{"status":"ok"}', media_type="application/json")
+_STATUS = Response(
+    content=json.dumps({"status": "ok", "version": app.version, "title": app.title}).encode(),
+    media_type="application/json",
+)
+
+
 @app.get("/health")
-def health():
-    return {"status": "ok"}
+async def health():
+    return _HEALTH
 
 
 @app.get("/status")
-def status():
-    return {"status": "ok", "version": app.version, "title": app.title}
+async def status():
+    return _STATUS
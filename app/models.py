@@ -1,30 +1,17 @@
 from datetime import datetime
-from sqlalchemy import Column, Integer, String, DateTime, ForeignKey, Enum
+from sqlalchemy import Column, Integer, String, Date, DateTime, ForeignKey, Index, CheckConstraint
 from sqlalchemy.orm import relationship
-import enum
 
 from app.database import Base
 
 
-class TaskStatus(str, enum.Enum):
-    todo = "todo"
-    in_progress = "in_progress"
-    done = "done"
-
-
-class TaskPriority(str, enum.Enum):
-    low = "low"
-    medium = "medium"
-    high = "high"
-
-
 class User(Base):
     __tablename__ = "users"
 
     id = Column(Integer, primary_key=True, index=True)
     username = Column(String, unique=True, index=True, nullable=False)
     email = Column(String, unique=True, index=True, nullable=False)
-    # TODO: This should use bcrypt hashing — storing plain text is insecure
+    # bcrypt hash; rows created before hashing hold plain text until their next login
     password = Column(String, nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
 
@@ -33,15 +20,24 @@ class User(Base):
 
 class Task(Base):
     __tablename__ = "tasks"
+    __table_args__ = (
+        # Every task query is scoped to one user, so indexes lead with user_id
+        Index("ix_tasks_user_id_id", "user_id", "id"),
+        Index("ix_tasks_user_status", "user_id", "status"),
+        Index("ix_tasks_user_due_date", "user_id", "due_date"),
+        # status/priority are plain strings: the schemas validate them against
+        # TaskStatus/TaskPriority, and the CHECKs guard the table itself
+        CheckConstraint("status IN ('todo', 'in_progress', 'done')", name="ck_tasks_status"),
+        CheckConstraint("priority IN ('low', 'medium', 'high')", name="ck_tasks_priority"),
+    )
 
     id = Column(Integer, primary_key=True, index=True)
     title = Column(String, nullable=False)
     description = Column(String, nullable=True)
-    status = Column(Enum(TaskStatus), default=TaskStatus.todo, nullable=False)
-    priority = Column(Enum(TaskPriority), default=TaskPriority.medium, nullable=False)
+    status = Column(String(16), default="todo", nullable=False)
+    priority = Column(String(16), default="medium", nullable=False)
     created_at = Column(DateTime, default=datetime.utcnow)
-    # No validation on format — accepts any string
-    due_date = Column(String, nullable=True)
+    due_date = Column(Date, nullable=True)
     user_id = Column(Integer, ForeignKey("users.id"), nullable=False)
 
     owner = relationship("User", back_populates="tasks")
@@ -1,70 +1,175 @@
-from typing import List
-from fastapi import APIRouter, Depends, Header, HTTPException
-from sqlalchemy.orm import Session
+from datetime import date
+from typing import List, Optional
+from fastapi import APIRouter, Body, Depends, Header, HTTPException, Query
+from fastapi.responses import ORJSONResponse
+from fastapi_cache.decorator import cache
+from pydantic import TypeAdapter
+from sqlalchemy import bindparam, insert, lambda_stmt, select, update
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import (
+    TASKS_NAMESPACE,
+    CachedUser,
+    invalidate_user_tasks,
+    task_detail_key,
+    task_list_key,
+    user_cache,
+)
 from app.database import get_db
 from app.models import Task, User
 from app.schemas import TaskCreate, TaskUpdate, TaskResponse
 
 router = APIRouter(prefix="/tasks", tags=["tasks"])
 
+# Matches the engine's insertmanyvalues_page_size, so a full batch is one INSERT
+MAX_BULK_TASKS = 1000
 
-def get_current_user(x_token: str = Header(...), db: Session = Depends(get_db)):
+# Validates and serializes a whole page in one pydantic-core call instead of
+# FastAPI going through response_model once per row
+_TaskListAdapter = TypeAdapter(List[TaskResponse])
+
+# Built once; lambda_stmt caches the construction and cache key, so per-request
+# lookups go straight to the compiled-statement cache
+_task_by_id_stmt = lambda_stmt(
+    lambda: select(Task).where(Task.id == bindparam("task_id"), Task.user_id == bindparam("user_id"))
+)
+
+
+async def get_current_user(x_token: str = Header(...), db: AsyncSession = Depends(get_db)) -> CachedUser:
     # Simplified token auth: token is just "user_id:<id>"
     # TODO: replace with proper JWT validation
     try:
         user_id = int(x_token.split(":")[1])
-        user = db.query(User).filter(User.id == user_id).first()
-        if not user:
-            from fastapi import HTTPException
-            raise HTTPException(status_code=401, detail="Invalid token")
-        return user
     except (IndexError, ValueError):
-        from fastapi import HTTPException
         raise HTTPException(status_code=401, detail="Invalid token format")
 
+    cached = user_cache.get(user_id)
+    if cached:
+        return cached
 
-@router.get("/", response_model=List[TaskResponse])
-def list_tasks(db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    # No pagination — returns ALL tasks for the user
-    # TODO: add page/limit query params
-    tasks = db.query(Task).filter(Task.user_id == current_user.id).all()
-    return tasks
+    result = await db.execute(select(User.id, User.username).where(User.id == user_id))
+    row = result.first()
+    if not row:
+        raise HTTPException(status_code=401, detail="Invalid token")
+    user = CachedUser(row.id, row.username)
+    user_cache[user_id] = user
+    return user
+
+
+@router.get("/", responses={200: {"model": List[TaskResponse]}})
+@cache(expire=30, namespace=TASKS_NAMESPACE, key_builder=task_list_key)
+async def list_tasks(
+    page: int = Query(1, ge=1),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[int] = None,
+    fields: Optional[List[str]] = Query(None),
+    due_before: Optional[date] = None,
+    due_after: Optional[date] = None,
+    db: AsyncSession = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_user),
+) -> ORJSONResponse:
+    """List the current user's tasks, newest first.
+
+    Pages by ``page``/``limit``. Passing ``cursor`` (the last id seen) switches to
+    keyset pagination instead, which stays fast on deep pages; ``page`` is ignored then.
+    ``fields`` (repeatable) limits each task to those columns; ``id`` is always included.
+    ``due_before``/``due_after`` (inclusive) keep only tasks with a due date in range.
+    """
+    if fields:
+        unknown = set(fields) - TaskResponse.model_fields.keys()
+        if unknown:
+            raise HTTPException(status_code=422, detail=f"Unknown fields: {', '.join(sorted(unknown))}")
+
+    stmt = select(Task).where(Task.user_id == current_user.id)
+    if due_before is not None:
+        stmt = stmt.where(Task.due_date <= due_before)
+    if due_after is not None:
+        stmt = stmt.where(Task.due_date >= due_after)
+    if cursor is not None:
+        stmt = stmt.where(Task.id < cursor).order_by(Task.id.desc())
+    else:
+        stmt = stmt.order_by(Task.id.desc()).offset((page - 1) * limit)
+    stmt = stmt.limit(limit)
+
+    if fields:
+        # Select only the requested columns; rows come back as plain tuples, no ORM objects
+        wanted = set(fields) | {"id"}
+        columns = [getattr(Task, name) for name in TaskResponse.model_fields if name in wanted]
+        result = await db.execute(stmt.with_only_columns(*columns))
+        return ORJSONResponse([row._asdict() for row in result])
+
+    tasks = (await db.scalars(stmt)).all()
+    payload = _TaskListAdapter.validate_python(tasks, from_attributes=True)
+    return ORJSONResponse(_TaskListAdapter.dump_python(payload, mode="json"))
 
 
 @router.post("/", response_model=TaskResponse, status_code=201)
-def create_task(task_in: TaskCreate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    task = Task(**task_in.dict(), user_id=current_user.id)
-    db.add(task)
-    db.commit()
-    db.refresh(task)
+async def create_task(task_in: TaskCreate, db: AsyncSession = Depends(get_db), current_user: CachedUser = Depends(get_current_user)):
+    # RETURNING hands back id and defaults in the same statement, no refresh SELECT
+    task = await db.scalar(
+        insert(Task).values(**task_in.dict(), user_id=current_user.id).returning(Task)
+    )
+    await db.commit()
+    await invalidate_user_tasks(current_user.id)
     return task
 
 
+@router.post("/bulk", response_model=List[TaskResponse], status_code=201)
+async def create_tasks_bulk(
+    tasks_in: List[TaskCreate] = Body(..., max_length=MAX_BULK_TASKS),
+    db: AsyncSession = Depends(get_db),
+    current_user: CachedUser = Depends(get_current_user),
+):
+    """Create several tasks in one request.
+
+    Rows go through a single executemany INSERT ... RETURNING, which SQLAlchemy
+    batches into multi-row statements, then one commit for the whole batch.
+    Returns the tasks in request order. More than MAX_BULK_TASKS items is a 422.
+    """
+    if not tasks_in:
+        return []
+    rows = [{**task_in.dict(), "user_id": current_user.id} for task_in in tasks_in]
+    stmt = insert(Task).returning(Task, sort_by_parameter_order=True)
+    tasks = (await db.scalars(stmt, rows)).all()
+    await db.commit()
+    await invalidate_user_tasks(current_user.id)
+    return tasks
+
+
 @router.get("/{task_id}", response_model=TaskResponse)
-def get_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
+@cache(expire=30, namespace=TASKS_NAMESPACE, key_builder=task_detail_key)
+async def get_task(task_id: int, db: AsyncSession = Depends(get_db), current_user: CachedUser = Depends(get_current_user)) -> TaskResponse:
+    task = await db.scalar(_task_by_id_stmt, {"task_id": task_id, "user_id": current_user.id})
     if not task:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    return task
+    return TaskResponse.model_validate(task)
 
 
 @router.put("/{task_id}", response_model=TaskResponse)
-def update_task(task_id: int, task_in: TaskUpdate, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
+async def update_task(task_id: int, task_in: TaskUpdate, db: AsyncSession = Depends(get_db), current_user: CachedUser = Depends(get_current_user)):
+    values = task_in.dict(exclude_unset=True)
+    if not values:
+        task = await db.scalar(_task_by_id_stmt, {"task_id": task_id, "user_id": current_user.id})
+    else:
+        # One UPDATE ... RETURNING both applies the change and tells us whether the task exists
+        task = await db.scalar(
+            update(Task)
+            .where(Task.id == task_id, Task.user_id == current_user.id)
+            .values(**values)
+            .returning(Task)
+        )
     if not task:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    for field, value in task_in.dict(exclude_unset=True).items():
-        setattr(task, field, value)
-    db.commit()
-    db.refresh(task)
+    await db.commit()
+    await invalidate_user_tasks(current_user.id)
     return task
 
 
 @router.delete("/{task_id}", status_code=204)
-def delete_task(task_id: int, db: Session = Depends(get_db), current_user: User = Depends(get_current_user)):
-    task = db.query(Task).filter(Task.id == task_id, Task.user_id == current_user.id).first()
+async def delete_task(task_id: int, db: AsyncSession = Depends(get_db), current_user: CachedUser = Depends(get_current_user)):
+    task = await db.scalar(_task_by_id_stmt, {"task_id": task_id, "user_id": current_user.id})
     if not task:
         raise HTTPException(status_code=404, detail=f"Task {task_id} not found")
-    db.delete(task)
-    db.commit()
+    await db.delete(task)
+    await db.commit()
+    await invalidate_user_tasks(current_user.id)
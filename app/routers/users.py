@@ -1,45 +1,75 @@
+import hashlib
+import hmac
+import secrets
+
 from fastapi import APIRouter, Depends, HTTPException
-from sqlalchemy.orm import Session
+from fastapi.concurrency import run_in_threadpool
+from passlib.context import CryptContext
+from sqlalchemy import select, update
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.cache import login_cache
 from app.database import get_db
 from app.models import User
 from app.schemas import UserCreate, UserResponse, UserLogin, TokenResponse
 
 router = APIRouter(prefix="/users", tags=["users"])
 
+# Cost 12 is the minimum in kb_code_review_standards.md; login_cache absorbs the
+# cost of repeat logins
+pwd_ctx = CryptContext(schemes=["bcrypt"], bcrypt__rounds=12)
+_login_cache_key = secrets.token_bytes(32)
 
-@router.post("/register", response_model=UserResponse, status_code=201)
-def register(user_in: UserCreate, db: Session = Depends(get_db)):
-    existing = db.query(User).filter(User.username == user_in.username).first()
-    if existing:
-        raise HTTPException(status_code=400, detail="Username already taken")
 
-    existing_email = db.query(User).filter(User.email == user_in.email).first()
-    if existing_email:
-        raise HTTPException(status_code=400, detail="Email already registered")
+def _password_digest(password: str) -> bytes:
+    return hmac.new(_login_cache_key, password.encode(), hashlib.sha256).digest()
+
 
-    # WARNING: storing password in plain text — no hashing
-    # TODO: use bcrypt: hashed = bcrypt.hashpw(user_in.password.encode(), bcrypt.gensalt())
+@router.post("/register", response_model=UserResponse, status_code=201)
+async def register(user_in: UserCreate, db: AsyncSession = Depends(get_db)):
+    # bcrypt is deliberately slow; keep it off the event loop
+    hashed = await run_in_threadpool(pwd_ctx.hash, user_in.password)
     user = User(
         username=user_in.username,
         email=user_in.email,
-        password=user_in.password,  # plain text — insecure
+        password=hashed,
     )
     db.add(user)
-    db.commit()
-    db.refresh(user)
+    # Let the unique constraints decide: no pre-check SELECTs, and no race
+    # between checking and inserting
+    try:
+        await db.commit()
+    except IntegrityError as e:
+        await db.rollback()
+        if "users.username" in str(e.orig):
+            raise HTTPException(status_code=400, detail="Username already taken")
+        if "users.email" in str(e.orig):
+            raise HTTPException(status_code=400, detail="Email already registered")
+        raise
     return user
 
 
 @router.post("/login", response_model=TokenResponse)
-def login(credentials: UserLogin, db: Session = Depends(get_db)):
-    user = db.query(User).filter(User.username == credentials.username).first()
+async def login(credentials: UserLogin, db: AsyncSession = Depends(get_db)):
+    result = await db.execute(select(User.id, User.password).where(User.username == credentials.username))
+    user = result.first()
     if not user:
         raise HTTPException(status_code=401, detail="Invalid username or password")
 
-    # Plain text comparison — should be bcrypt.checkpw()
-    if user.password != credentials.password:
-        raise HTTPException(status_code=401, detail="Invalid username or password")
+    cache_key = (user.id, user.password, _password_digest(credentials.password))
+    if cache_key not in login_cache:
+        if pwd_ctx.identify(user.password) is None:
+            # Account created before hashing: compare the plain text once, then upgrade it
+            if not secrets.compare_digest(user.password.encode(), credentials.password.encode()):
+                raise HTTPException(status_code=401, detail="Invalid username or password")
+            hashed = await run_in_threadpool(pwd_ctx.hash, credentials.password)
+            await db.execute(update(User).where(User.id == user.id).values(password=hashed))
+            await db.commit()
+        else:
+            if not await run_in_threadpool(pwd_ctx.verify, credentials.password, user.password):
+                raise HTTPException(status_code=401, detail="Invalid username or password")
+            login_cache[cache_key] = True
 
     # Returning a trivially forgeable token — should be JWT
     token = f"user_id:{user.id}"
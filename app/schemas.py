@@ -1,8 +1,19 @@
-from datetime import datetime
+import enum
+from datetime import date, datetime
 from typing import Optional
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
 
-from app.models import TaskStatus, TaskPriority
+
+class TaskStatus(str, enum.Enum):
+    todo = "todo"
+    in_progress = "in_progress"
+    done = "done"
+
+
+class TaskPriority(str, enum.Enum):
+    low = "low"
+    medium = "medium"
+    high = "high"
 
 
 class UserCreate(BaseModel):
@@ -12,14 +23,13 @@ class UserCreate(BaseModel):
 
 
 class UserResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     username: str
     email: str
     created_at: datetime
 
-    class Config:
-        from_attributes = True
-
 
 class UserLogin(BaseModel):
     username: str
@@ -32,30 +42,34 @@ class TokenResponse(BaseModel):
 
 
 class TaskCreate(BaseModel):
+    # Columns are plain strings, so hand the ORM enum values rather than members
+    model_config = ConfigDict(use_enum_values=True)
+
     title: str
     description: Optional[str] = None
     status: TaskStatus = TaskStatus.todo
     priority: TaskPriority = TaskPriority.medium
-    due_date: Optional[str] = None  # No format validation — accepts any string
+    due_date: Optional[date] = None  # ISO 8601, e.g. 2024-05-31
 
 
 class TaskUpdate(BaseModel):
+    model_config = ConfigDict(use_enum_values=True)
+
     title: Optional[str] = None
     description: Optional[str] = None
     status: Optional[TaskStatus] = None
     priority: Optional[TaskPriority] = None
-    due_date: Optional[str] = None
+    due_date: Optional[date] = None
 
 
 class TaskResponse(BaseModel):
+    model_config = ConfigDict(from_attributes=True)
+
     id: int
     title: str
     description: Optional[str]
     status: TaskStatus
     priority: TaskPriority
     created_at: datetime
-    due_date: Optional[str]
+    due_date: Optional[date]
     user_id: int
-
-    class Config:
-        from_attributes = True
@@ -0,0 +1,79 @@
+import pytest
+from anyio.from_thread import start_blocking_portal
+from fastapi.testclient import TestClient
+from fastapi_cache import FastAPICache
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession, create_async_engine
+from sqlalchemy.pool import StaticPool
+
+from app.main import app
+from app.cache import init_cache, user_cache
+from app.database import Base, get_db
+
+# One in-memory database for the whole run; StaticPool keeps its single
+# connection (and so the database) alive between tests
+engine = create_async_engine("sqlite+aiosqlite://", poolclass=StaticPool)
+
+
+# Let SQLAlchemy emit BEGIN itself. Otherwise the driver treats a SAVEPOINT as
+# the outermost transaction and releasing it commits past the per-test rollback.
+@event.listens_for(engine.sync_engine, "connect")
+def _disable_driver_transactions(dbapi_connection, connection_record):
+    dbapi_connection.isolation_level = None
+
+
+@event.listens_for(engine.sync_engine, "begin")
+def _emit_begin(conn):
+    conn.exec_driver_sql("BEGIN")
+
+
+@pytest.fixture(scope="session")
+def portal():
+    # Fixtures are sync; async setup and teardown run on this long-lived loop
+    with start_blocking_portal() as portal:
+        yield portal
+
+
+@pytest.fixture(scope="session", autouse=True)
+def schema(portal):
+    async def create_all():
+        async with engine.begin() as conn:
+            await conn.run_sync(Base.metadata.create_all)
+
+    portal.call(create_all)
+    init_cache()
+    yield
+    portal.call(engine.dispose)
+
+
+@pytest.fixture
+def db_connection(portal):
+    # Each test runs in one transaction that is rolled back at the end; the
+    # app's sessions commit to SAVEPOINTs inside it
+    conn = engine.connect()
+    portal.call(conn.start)
+    trans = conn.begin()
+    portal.call(trans.start)
+
+    async def override_get_db():
+        async with AsyncSession(
+            bind=conn,
+            autoflush=False,
+            expire_on_commit=False,
+            join_transaction_mode="create_savepoint",
+        ) as db:
+            yield db
+
+    app.dependency_overrides[get_db] = override_get_db
+    yield conn
+    app.dependency_overrides.clear()
+    portal.call(trans.rollback)
+    portal.call(conn.close)
+    # Ids are reused after the rollback, so cached users and responses must go too
+    user_cache.clear()
+    portal.call(FastAPICache.clear)
+
+
+@pytest.fixture
+def client(db_connection):
+    return TestClient(app)
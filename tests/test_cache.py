@@ -0,0 +1,58 @@
+import fakeredis
+import pytest
+from fastapi_cache import FastAPICache
+
+from app.cache import BoundedInMemoryBackend, TaggedRedisBackend, invalidate_user_tasks
+
+
+@pytest.fixture
+def redis_backend(monkeypatch):
+    redis = fakeredis.FakeAsyncRedis()
+    # FastAPICache.init() is a no-op once the session has initialised it, so
+    # swap the backend in directly for this test
+    monkeypatch.setattr(FastAPICache, "_backend", TaggedRedisBackend(redis))
+    return redis
+
+
+def test_invalidate_user_tasks_unlinks_tagged_keys(portal, redis_backend):
+    backend = FastAPICache.get_backend()
+    portal.call(backend.set, "tm:tasks:1:list:page=1", "[]", 30)
+    portal.call(backend.set, "tm:tasks:1:5", "{}", 30)
+    portal.call(backend.set, "tm:tasks:2:list:", "[]", 30)
+    assert portal.call(redis_backend.smembers, "tag:tm:tasks:1") == {b"tm:tasks:1:list:page=1", b"tm:tasks:1:5"}
+
+    portal.call(invalidate_user_tasks, 1)
+
+    assert portal.call(redis_backend.exists, "tm:tasks:1:list:page=1", "tm:tasks:1:5", "tag:tm:tasks:1") == 0
+    assert portal.call(redis_backend.get, "tm:tasks:2:list:") == b"[]"
+
+
+def test_tag_set_drops_expired_keys_past_max_size(portal, redis_backend, monkeypatch):
+    backend = FastAPICache.get_backend()
+    monkeypatch.setattr(backend, "max_tag_size", 3)
+    for i in range(3):
+        portal.call(backend.set, f"tm:tasks:1:list:{i}", "[]", 30)
+    # Stand in for expiry
+    portal.call(redis_backend.delete, "tm:tasks:1:list:0", "tm:tasks:1:list:1")
+
+    portal.call(backend.set, "tm:tasks:1:list:3", "[]", 30)
+
+    live = {b"tm:tasks:1:list:2", b"tm:tasks:1:list:3"}
+    assert portal.call(redis_backend.smembers, "tag:tm:tasks:1") == live
+
+
+def test_in_memory_clear_stops_at_user_boundary(portal):
+    backend = BoundedInMemoryBackend()
+    portal.call(backend.set, "tm:tasks:1:list:", "[]", 30)
+    portal.call(backend.set, "tm:tasks:10:list:", "[]", 30)
+
+    assert portal.call(backend.clear, "tm:tasks:1") == 1
+    assert portal.call(backend.get, "tm:tasks:10:list:") == "[]"
+
+
+def test_in_memory_store_is_bounded(portal):
+    backend = BoundedInMemoryBackend(maxsize=3)
+    for i in range(10):
+        portal.call(backend.set, f"tm:tasks:1:{i}", "{}", 30)
+    assert len(backend._store) == 3
+
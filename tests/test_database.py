@@ -0,0 +1,57 @@
+import pytest
+from sqlalchemy import column, delete, event, insert, select, table, text
+
+from app import database
+from app.models import Task, User
+
+# Untyped view of the tasks table, so legacy free-text due dates can be
+# written and read back without the Date type's conversion
+legacy_tasks = table("tasks", column("id"), column("title"), column("status"),
+                     column("priority"), column("due_date"), column("user_id"))
+
+
+@pytest.fixture
+def file_engine(portal, tmp_path, monkeypatch):
+    # create_tables() against a throwaway file database, with the app's pragmas
+    engine = database.create_async_engine(f"sqlite+aiosqlite:///{tmp_path / 'app.db'}")
+    event.listen(engine.sync_engine, "connect", database.set_sqlite_pragmas)
+    monkeypatch.setattr(database, "engine", engine)
+    portal.call(database.create_tables)
+    yield engine
+    portal.call(engine.dispose)
+
+
+def run(portal, engine, stmt, params=None):
+    async def execute():
+        async with engine.begin() as conn:
+            result = await conn.execute(stmt, params)
+            return result.all() if result.returns_rows else None
+    return portal.call(execute)
+
+
+def test_upgrade_normalises_legacy_due_dates(portal, file_engine):
+    run(portal, file_engine, insert(User), {"id": 1, "username": "old", "email": "old@example.com", "password": "x"})
+    legacy = ["2024-05-31", "2024-06-01T10:00:00", "2024", "5", "05/31/2024", "2024-13-45", "2024-02-30", None]
+    run(portal, file_engine, insert(legacy_tasks), [
+        {"title": str(value), "status": "todo", "priority": "medium", "due_date": value, "user_id": 1}
+        for value in legacy
+    ])
+
+    portal.call(database.create_tables)
+
+    rows = run(portal, file_engine, select(legacy_tasks.c.due_date).order_by(legacy_tasks.c.id))
+    assert [row.due_date for row in rows] == ["2024-05-31", "2024-06-01"] + [None] * 6
+
+
+def test_create_tables_reclaims_free_pages(portal, file_engine):
+    run(portal, file_engine, insert(User), {"id": 1, "username": "u", "email": "u@example.com", "password": "x"})
+    run(portal, file_engine, insert(Task), [
+        {"title": "x" * 1000, "description": "y" * 1000, "user_id": 1} for _ in range(2000)
+    ])
+    run(portal, file_engine, delete(Task))
+    freed = run(portal, file_engine, text("PRAGMA freelist_count"))[0][0]
+    assert freed > 100
+
+    portal.call(database.create_tables)
+
+    assert run(portal, file_engine, text("PRAGMA freelist_count"))[0][0] == 0
@@ -0,0 +1,17 @@
+import pytest
+
+from app.main import app
+
+
+@pytest.mark.parametrize("path, body", [
+    ("/health", {"status": "ok"}),
+    ("/status", {"status": "ok", "version": app.version, "title": app.title}),
+])
+def test_probe_endpoints(client, path, body):
+    # Served from responses built once at import; repeat to catch shared-state issues
+    for _ in range(2):
+        resp = client.get(path)
+        assert resp.status_code == 200
+        assert resp.headers["content-type"] == "application/json"
+        assert resp.json() == body
+        assert "cache-control" not in resp.headers
@@ -1,38 +1,19 @@
 import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from fastapi_cache import FastAPICache
+from sqlalchemy import insert
 
-from app.main import app
-from app.database import Base, get_db
-from app.models import User
-
-TEST_DB_URL = "sqlite:///./test_taskmanager.db"
-engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-app.dependency_overrides[get_db] = override_get_db
-
-
-@pytest.fixture(autouse=True)
-def setup_db():
-    Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
+from app.models import Task
 
 
 @pytest.fixture
-def client():
-    return TestClient(app)
+def seed_tasks(portal, db_connection):
+    # Insert directly in one statement; only the reads under test go over HTTP
+    def seed(n, user_id):
+        portal.call(db_connection.execute, insert(Task), [
+            {"title": f"Task {i}", "user_id": user_id, "status": "todo", "priority": "medium"}
+            for i in range(n)
+        ])
+    return seed
 
 
 @pytest.fixture
@@ -50,6 +31,16 @@ def auth_headers(client):
     return {"x-token": token}
 
 
+@pytest.fixture
+def user_id(auth_headers):
+    return int(auth_headers["x-token"].split(":")[1])
+
+
+def test_invalid_token_rejected(client):
+    resp = client.get("/tasks/", headers={"x-token": "user_id:42"})
+    assert resp.status_code == 401
+
+
 def test_create_task(client, auth_headers):
     resp = client.post("/tasks/", json={
         "title": "Buy groceries",
@@ -63,6 +54,31 @@ def test_create_task(client, auth_headers):
     assert data["priority"] == "high"
 
 
+def test_create_tasks_bulk(client, auth_headers):
+    resp = client.post("/tasks/bulk", json=[
+        {"title": "Task 1"},
+        {"title": "Task 2", "priority": "high"},
+    ], headers=auth_headers)
+    assert resp.status_code == 201
+    data = resp.json()
+    assert [t["title"] for t in data] == ["Task 1", "Task 2"]
+    assert data[1]["priority"] == "high"
+    assert len(client.get("/tasks/", headers=auth_headers).json()) == 2
+
+
+def test_create_tasks_bulk_rejects_invalid_task(client, auth_headers):
+    resp = client.post("/tasks/bulk", json=[{"title": "ok"}, {"priority": "high"}], headers=auth_headers)
+    assert resp.status_code == 422
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+
+
+def test_create_tasks_bulk_rejects_oversized_batch(client, auth_headers):
+    batch = [{"title": f"Task {i}"} for i in range(1001)]
+    resp = client.post("/tasks/bulk", json=batch, headers=auth_headers)
+    assert resp.status_code == 422
+    assert client.get("/tasks/", headers=auth_headers).json() == []
+
+
 def test_list_tasks(client, auth_headers):
     client.post("/tasks/", json={"title": "Task 1"}, headers=auth_headers)
     client.post("/tasks/", json={"title": "Task 2"}, headers=auth_headers)
@@ -71,6 +87,61 @@ def test_list_tasks(client, auth_headers):
     assert len(resp.json()) == 2
 
 
+def test_list_tasks_reflects_new_task_after_cached_read(client, auth_headers):
+    client.post("/tasks/", json={"title": "Task 1"}, headers=auth_headers)
+    assert len(client.get("/tasks/", headers=auth_headers).json()) == 1
+    client.post("/tasks/", json={"title": "Task 2"}, headers=auth_headers)
+    assert len(client.get("/tasks/", headers=auth_headers).json()) == 2
+
+
+def test_list_tasks_selected_fields(client, auth_headers):
+    client.post("/tasks/", json={"title": "Task 1", "description": "long text"}, headers=auth_headers)
+    resp = client.get("/tasks/?fields=title&fields=status", headers=auth_headers)
+    assert resp.status_code == 200
+    assert resp.json() == [{"id": 1, "title": "Task 1", "status": "todo"}]
+
+
+def test_list_tasks_unknown_field_rejected(client, auth_headers):
+    resp = client.get("/tasks/?fields=password", headers=auth_headers)
+    assert resp.status_code == 422
+
+
+def test_list_tasks_due_date_range(client, auth_headers):
+    for title, due in [("early", "2024-05-01"), ("mid", "2024-05-15"), ("late", "2024-06-01"), ("none", None)]:
+        client.post("/tasks/", json={"title": title, "due_date": due}, headers=auth_headers)
+    resp = client.get("/tasks/?due_after=2024-05-10&due_before=2024-05-31", headers=auth_headers)
+    assert resp.status_code == 200
+    assert [t["title"] for t in resp.json()] == ["mid"]
+
+
+def test_task_list_key_ignores_unknown_params(client, auth_headers):
+    backend = FastAPICache.get_backend()
+    for i in range(20):
+        client.get(f"/tasks/?junk={i}", headers=auth_headers)
+    client.get("/tasks/?limit=5&page=1", headers=auth_headers)
+    client.get("/tasks/?page=1&limit=5", headers=auth_headers)
+    assert len([key for key in backend._store if ":list:" in key]) == 2
+
+
+def test_create_task_rejects_invalid_due_date(client, auth_headers):
+    resp = client.post("/tasks/", json={"title": "Task", "due_date": "not-a-date"}, headers=auth_headers)
+    assert resp.status_code == 422
+
+
+def test_update_nonexistent_task_returns_404(client, auth_headers):
+    resp = client.put("/tasks/99999", json={"status": "done"}, headers=auth_headers)
+    assert resp.status_code == 404
+
+
+def test_task_responses_not_shareable(client, auth_headers):
+    task_id = client.post("/tasks/", json={"title": "Task 1"}, headers=auth_headers).json()["id"]
+    # Second request of each pair is served from the server-side cache
+    for path in ["/tasks/", "/tasks/", f"/tasks/{task_id}", f"/tasks/{task_id}"]:
+        resp = client.get(path, headers=auth_headers)
+        assert resp.headers["cache-control"] == "private, no-cache"
+        assert resp.headers["vary"] == "X-Token"
+
+
 def test_update_task_status(client, auth_headers):
     create_resp = client.post("/tasks/", json={"title": "Finish report"}, headers=auth_headers)
     task_id = create_resp.json()["id"]
@@ -85,10 +156,19 @@ def test_get_nonexistent_task_returns_404(client, auth_headers):
     assert resp.status_code == 404
 
 
-@pytest.mark.skip(reason="TODO: implement — pagination not yet supported")
-def test_list_tasks_pagination(client, auth_headers):
-    for i in range(25):
-        client.post("/tasks/", json={"title": f"Task {i}"}, headers=auth_headers)
+def test_list_tasks_pagination(client, auth_headers, user_id, seed_tasks):
+    seed_tasks(25, user_id)
     resp = client.get("/tasks/?page=1&limit=10", headers=auth_headers)
     assert resp.status_code == 200
     assert len(resp.json()) == 10
+    resp = client.get("/tasks/?page=3&limit=10", headers=auth_headers)
+    assert len(resp.json()) == 5
+
+
+def test_list_tasks_cursor_pagination(client, auth_headers, user_id, seed_tasks):
+    seed_tasks(5, user_id)
+    first_page = client.get("/tasks/?limit=3", headers=auth_headers).json()
+    last_id = first_page[-1]["id"]
+    resp = client.get(f"/tasks/?limit=3&cursor={last_id}", headers=auth_headers)
+    assert resp.status_code == 200
+    assert [t["id"] for t in resp.json()] == [last_id - 1, last_id - 2]
@@ -1,37 +1,6 @@
-import pytest
-from fastapi.testclient import TestClient
-from sqlalchemy import create_engine
-from sqlalchemy.orm import sessionmaker
+from sqlalchemy import select
 
-from app.main import app
-from app.database import Base, get_db
-
-TEST_DB_URL = "sqlite:///./test_users.db"
-engine = create_engine(TEST_DB_URL, connect_args={"check_same_thread": False})
-TestingSessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
-
-
-def override_get_db():
-    db = TestingSessionLocal()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-app.dependency_overrides[get_db] = override_get_db
-
-
-@pytest.fixture(autouse=True)
-def setup_db():
-    Base.metadata.create_all(bind=engine)
-    yield
-    Base.metadata.drop_all(bind=engine)
-
-
-@pytest.fixture
-def client():
-    return TestClient(app)
+from app.models import User
 
 
 def test_register_user(client):
@@ -60,6 +29,21 @@ def test_register_duplicate_username(client):
     assert resp.status_code == 400
 
 
+def test_register_duplicate_email(client):
+    client.post("/users/register", json={
+        "username": "erin",
+        "email": "erin@example.com",
+        "password": "secret"
+    })
+    resp = client.post("/users/register", json={
+        "username": "erin2",
+        "email": "erin@example.com",
+        "password": "secret"
+    })
+    assert resp.status_code == 400
+    assert resp.json()["detail"] == "Email already registered"
+
+
 def test_login_success(client):
     client.post("/users/register", json={
         "username": "charlie",
@@ -74,6 +58,17 @@ def test_login_success(client):
     assert "token" in resp.json()
 
 
+def test_password_stored_hashed(client, portal, db_connection):
+    client.post("/users/register", json={
+        "username": "frank",
+        "email": "frank@example.com",
+        "password": "hunter22"
+    })
+    stored = portal.call(db_connection.scalar, select(User.password).where(User.username == "frank"))
+    assert stored != "hunter22"
+    assert stored.startswith("$2b$12$")
+
+
 def test_login_wrong_password(client):
     client.post("/users/register", json={
         "username": "dave",